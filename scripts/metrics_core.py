@@ -0,0 +1,794 @@
+"""
+Code Metrics Core
+
+Shared analysis behind scripts/verify_metrics.py and
+tools/check_code_metrics.py:
+- Max 500 lines per file (excluding comments/blank lines)
+- Max 50 lines per function (excluding comments/blank lines)
+
+Supports Dart and Rust source files.
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import pickle
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import accumulate, islice, repeat
+from operator import methodcaller, sub
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+MAX_FILE_LINES = 500
+MAX_FUNCTION_LINES = 50
+
+# Bump whenever the line/function counting logic or the pickled metrics
+# classes change so that stale cache entries are ignored.
+TOOL_VERSION = 5
+
+# Default on-disk cache shared by both entry points
+CACHE_PATH = Path(__file__).parent / '.metrics_cache.sqlite'
+
+# Source file extensions and the language they are analyzed as
+LANGUAGES = {
+    '.dart': 'dart',
+    '.rs': 'rust',
+}
+
+# Modifiers allowed before a Dart return type, in declaration order
+DART_MODIFIERS = ('static', 'final', 'const')
+
+# The Rust pattern is applied to whole file contents with re.MULTILINE, so
+# whitespace is spelled [^\S\n] and negated classes exclude newlines to keep
+# every match on a single line.
+
+# Regex to match Rust function declarations
+# Matches: fn foo(), pub fn bar(), pub(crate) async fn baz(), etc.
+_RUST_FN_RE = re.compile(
+    r'^[^\S\n]*(?:#\[[^\]\n]+\][^\S\n]*)*'  # attributes
+    r'(?:pub(?:\([^)\n]+\))?[^\S\n]+)?'  # visibility
+    r'(?:async[^\S\n]+)?'  # async
+    r'(?:unsafe[^\S\n]+)?'  # unsafe
+    r'fn[^\S\n]+([A-Za-z_]\w*)',  # function name
+    re.MULTILINE
+)
+
+
+# Build artifacts are pruned during the directory walk by exact directory
+# name; generated sources are skipped by file name suffix or marker.
+EXCLUDE_DIRS = frozenset({'build', '.dart_tool', 'target'})
+EXCLUDE_SUFFIXES = ('.g.dart', '.freezed.dart')
+EXCLUDE_NAME_PARTS = ('generated',)
+
+
+def iter_source_files(directory: Path, extensions: Sequence[str],
+                      exclude_dirs: Iterable[str] = EXCLUDE_DIRS,
+                      exclude_suffixes: Sequence[str] = EXCLUDE_SUFFIXES,
+                      exclude_name_parts: Sequence[str] = EXCLUDE_NAME_PARTS) -> Iterator[Path]:
+    """Yield files under directory with one of extensions, pruning excluded subtrees."""
+    suffixes = tuple(extensions)
+    exclude_dirs = frozenset(exclude_dirs)
+    exclude_suffixes = tuple(exclude_suffixes)
+
+    def excluded(name: str) -> bool:
+        return name.endswith(exclude_suffixes) or any(x in name for x in exclude_name_parts)
+
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in exclude_dirs and not excluded(d))
+        for name in sorted(files):
+            if name.endswith(suffixes) and not excluded(name):
+                yield Path(root) / name
+
+
+def scan_comment_line(line: str, in_block: bool) -> Tuple[bool, bool]:
+    """
+    Split a stripped line into code and comments, honouring '//', '/*' and
+    '*/' in the order they appear (so `a(); /* note */` is still code).
+    Returns: (has_code, in_block) where in_block is the state after the line
+    """
+    has_code = False
+    pos = 0
+    length = len(line)
+    while pos < length:
+        if in_block:
+            end = line.find('*/', pos)
+            if end < 0:
+                break
+            pos = end + 2
+            in_block = False
+            continue
+
+        start = line.find('/*', pos)
+        comment = line.find('//', pos)
+        if comment >= 0 and (start < 0 or comment < start):
+            has_code = has_code or bool(line[pos:comment].strip())
+            break
+        if start < 0:
+            has_code = has_code or bool(line[pos:].strip())
+            break
+        has_code = has_code or bool(line[pos:start].strip())
+        pos = start + 2
+        in_block = True
+    return has_code, in_block
+
+
+def count_plain_code(stripped: List[str]) -> int:
+    """Count code lines among stripped lines that contain no '/*'."""
+    return len(stripped) - sum(map(str.startswith, stripped, repeat('//')))
+
+
+def count_code_lines(stripped: List[str], in_block: bool = False) -> Tuple[int, bool]:
+    """
+    Count code lines among non-blank stripped lines.
+
+    Classifies with C-level list/str operations; the Python scanner only
+    walks from each line containing '/*' until its block comment closes.
+    in_block is the block-comment state before the first line.
+    Returns: (code_lines, in_block) where in_block is the state after the last line
+    """
+    code_lines = 0
+    count = len(stripped)
+    pos = 0
+    # A block comment left open by the previous chunk resumes at line 0
+    begins = [i for i, line in enumerate(stripped) if '/*' in line]
+    if in_block:
+        begins.insert(0, 0)
+    for begin in begins:
+        if begin < pos:
+            # Already consumed by the previous block comment
+            continue
+        code_lines += count_plain_code(stripped[pos:begin])
+        pos = begin
+        while pos < count:
+            has_code, in_block = scan_comment_line(stripped[pos], in_block)
+            code_lines += has_code
+            pos += 1
+            if not in_block:
+                break
+    code_lines += count_plain_code(stripped[pos:])
+    return code_lines, in_block
+
+
+def read_text(file_path: Path) -> str:
+    """
+    Decode a UTF-8 file straight from a read-only memory map.
+
+    Decoding from the mapping avoids an intermediate bytes copy and skips the
+    text layer's newline translation; a stray '\r' left on CRLF lines is
+    stripped during classification.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, 'utf-8')
+
+
+def _skip_space(line: str, pos: int) -> int:
+    """Return the index of the first non-whitespace character at or after pos."""
+    length = len(line)
+    while pos < length and line[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _scan_word(line: str, pos: int) -> int:
+    """Return the index just past the word characters starting at pos."""
+    length = len(line)
+    while pos < length and (line[pos].isalnum() or line[pos] == '_'):
+        pos += 1
+    return pos
+
+
+def _scan_group(line: str, pos: int, open_char: str, close_char: str) -> int:
+    """Return the index just past the bracket group opened at pos, or -1."""
+    depth = 0
+    for index in range(pos, len(line)):
+        char = line[index]
+        if char == open_char:
+            depth += 1
+        elif char == close_char:
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return -1
+
+
+def parse_dart_declaration(line: str) -> Optional[str]:
+    """
+    Match a single-line Dart function/method declaration such as
+    `void foo() {`, `static Future<T> bar(x) async {` or `int baz() =>`.
+
+    Scanned by hand instead of with a regex so that nested type arguments
+    (Map<String, List<int>>) and nested parentheses in parameter lists are
+    balanced correctly.
+    Returns: the function name, or None if the line is not a declaration
+    """
+    length = len(line)
+    pos = _skip_space(line, 0)
+
+    # Argument-less annotations: @override, @protected, ...
+    while pos < length and line[pos] == '@':
+        end = _scan_word(line, pos + 1)
+        if end == pos + 1 or end == length or not line[end].isspace():
+            return None
+        pos = _skip_space(line, end)
+
+    # Modifiers and return type, each optionally followed by type arguments,
+    # up to the function name directly before '('
+    words = []
+    while True:
+        char = line[pos] if pos < length else ''
+        if not (char == '_' or 'A' <= char <= 'Z' or 'a' <= char <= 'z'):
+            return None
+        end = _scan_word(line, pos + 1)
+        word = line[pos:end]
+        generic = end < length and line[end] == '<'
+        if generic:
+            end = _scan_group(line, end, '<', '>')
+            if end < 0 or line[end - 2] == '<':
+                return None
+        after = _skip_space(line, end)
+        if words and not generic and after < length and line[after] == '(':
+            name = word
+            pos = after
+            break
+        if after == end:
+            return None
+        words.append((word, generic))
+        pos = after
+
+    # Everything before the return type must be known modifiers, in order
+    order = iter(DART_MODIFIERS)
+    if not all(not generic and word in order for word, generic in words[:-1]):
+        return None
+
+    pos = _scan_group(line, pos, '(', ')')
+    if pos < 0:
+        return None
+    pos = _skip_space(line, pos)
+    if line.startswith('async', pos):
+        pos = _skip_space(line, pos + 5)
+    if line.startswith('=>', pos) or line.startswith('{', pos):
+        return name
+    return None
+
+
+def iter_rust_declarations(content: str) -> Iterator[re.Match]:
+    """
+    Yield _RUST_FN_RE matches in file order.
+
+    Every declaration contains the literal 'fn', so str.find jumps between
+    candidate lines and the regex is only anchored at their line starts
+    instead of being attempted at every line of the file.
+    """
+    find = content.find
+    match = _RUST_FN_RE.match
+    pos = find('fn')
+    while pos >= 0:
+        found = match(content, content.rfind('\n', 0, pos) + 1)
+        if found:
+            yield found
+        line_end = find('\n', pos)
+        if line_end < 0:
+            break
+        pos = find('fn', line_end)
+
+
+def brace_depths(lines: List[str]) -> List[int]:
+    """Return the cumulative '{' minus '}' depth at the end of each line."""
+    opens = map(methodcaller('count', '{'), lines)
+    closes = map(methodcaller('count', '}'), lines)
+    return list(accumulate(map(sub, opens, closes)))
+
+
+def block_end(depths: List[int], start: int) -> int:
+    """
+    Find the end of the brace block opened on line start.
+    Returns: index one past the line where the depth falls back to its
+    value before start (or len(depths) if it never does)
+    """
+    base = depths[start - 1] if start > 0 else 0
+    count = len(depths)
+
+    # Usually the depth steps back to exactly base; list.index and min keep
+    # that case in C
+    try:
+        candidate = depths.index(base, start)
+    except ValueError:
+        candidate = count
+    if candidate == start or min(islice(depths, start, candidate)) > base:
+        return min(candidate + 1, count)
+
+    # A line closed several blocks at once and skipped past base
+    for index, depth in enumerate(islice(depths, start, candidate), start):
+        if depth < base:
+            return index + 1
+    return count
+
+
+def line_starts(lines: List[str]) -> List[int]:
+    """Return the character offset at which each line begins."""
+    starts = [0]
+    offset = 0
+    for line in lines[:-1]:
+        offset += len(line) + 1
+        starts.append(offset)
+    return starts
+
+
+# Violations are kept as plain tuples and only formatted by the reports:
+#   (FILE_VIOLATION, code_lines)
+#   (FUNCTION_VIOLATION, code_lines, function_name, line_number)
+FILE_VIOLATION = 'file'
+FUNCTION_VIOLATION = 'function'
+Violation = Tuple
+
+
+class _FrozenSlots:
+    """
+    Base for frozen dataclasses with hand-written __slots__ (dataclass(slots=True)
+    needs Python 3.10). Frozen fields can't be restored by pickle's default
+    setattr path, so instances pickle as their constructor arguments.
+    """
+    __slots__ = ()
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+
+@dataclass(frozen=True)
+class FileMetrics(_FrozenSlots):
+    """Metrics for a single file."""
+    __slots__ = ('path', 'total_lines', 'code_lines', 'comment_lines',
+                 'blank_lines', 'violations')
+    path: str
+    total_lines: int
+    code_lines: int
+    comment_lines: int
+    blank_lines: int
+    violations: List[Violation]
+
+
+@dataclass(frozen=True)
+class FunctionMetrics(_FrozenSlots):
+    """Metrics for a single function."""
+    __slots__ = ('name', 'file_path', 'line_number', 'code_lines')
+    name: str
+    file_path: str
+    line_number: int
+    code_lines: int
+
+
+# (total_lines, code_lines, comment_lines, blank_lines), functions
+ScanResult = Tuple[Tuple[int, int, int, int], List[FunctionMetrics]]
+
+
+class MetricsCache:
+    """
+    On-disk cache of per-file analysis results.
+
+    Entries are keyed by relative path and validated against the SHA-256 of
+    the file content and TOOL_VERSION, so unchanged files skip scanning.
+    """
+
+    def __init__(self, db_path: Path):
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS metrics ('
+            'path TEXT PRIMARY KEY, sha TEXT NOT NULL, '
+            'version INTEGER NOT NULL, blob BLOB NOT NULL)'
+        )
+        self.pending: List[Tuple[str, str, int, bytes]] = []
+
+    @staticmethod
+    def digest(file_path: Path) -> Optional[str]:
+        """Return the SHA-256 hex digest of a file, or None if unreadable."""
+        try:
+            with open(file_path, 'rb') as f:
+                if hasattr(hashlib, 'file_digest'):
+                    return hashlib.file_digest(f, 'sha256').hexdigest()
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def get(self, path: str, sha: str):
+        """Return the cached result for path if its hash matches, else None."""
+        row = self.conn.execute(
+            'SELECT sha, version, blob FROM metrics WHERE path = ?', (path,)
+        ).fetchone()
+        if row is None or row[0] != sha or row[1] != TOOL_VERSION:
+            return None
+        try:
+            return pickle.loads(row[2])
+        except Exception:
+            return None
+
+    def put(self, path: str, sha: str, value) -> None:
+        """Queue a result to be written on the next flush."""
+        self.pending.append((path, sha, TOOL_VERSION, pickle.dumps(value)))
+
+    def flush(self) -> None:
+        """Write all queued results in a single transaction."""
+        if not self.pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO metrics (path, sha, version, blob) '
+                'VALUES (?, ?, ?, ?)',
+                self.pending
+            )
+        self.pending = []
+
+    def close(self) -> None:
+        """Flush pending results and close the database."""
+        self.flush()
+        self.conn.close()
+
+
+class MetricsAnalyzer:
+    """Analyzes code metrics for Dart and Rust files."""
+
+    MAX_FILE_LINES = MAX_FILE_LINES
+    MAX_FUNCTION_LINES = MAX_FUNCTION_LINES
+
+    # Below this many uncached files the process pool costs more than it saves
+    PARALLEL_MIN_FILES = 64
+
+    # Smallest chunk the fast path classifies at once, so files that hover
+    # around the limit aren't walked a few lines at a time
+    FAST_PATH_MIN_CHUNK = 256
+
+    def __init__(self, project_root: Path, cache_path: Optional[Path] = None,
+                 jobs: Optional[int] = None,
+                 exclude_dirs: Iterable[str] = EXCLUDE_DIRS,
+                 exclude_suffixes: Sequence[str] = EXCLUDE_SUFFIXES,
+                 exclude_name_parts: Sequence[str] = EXCLUDE_NAME_PARTS,
+                 fast_path: bool = False):
+        self.project_root = project_root
+        # Scanned paths are built by joining onto the root, so their relative
+        # form is a plain string slice. Path('.') / 'lib' is just 'lib', so a
+        # '.' root (script run from the project root) has an empty prefix.
+        root_str = str(project_root)
+        self._root_str = '' if root_str == '.' else os.path.join(root_str, '')
+        self._root_len = len(self._root_str)
+        # Only decide pass/fail: stop counting once a limit is exceeded, so
+        # reported sizes of violating files/functions are lower bounds
+        self.fast_path = fast_path
+        self.exclude_dirs = frozenset(exclude_dirs)
+        self.exclude_suffixes = tuple(exclude_suffixes)
+        self.exclude_name_parts = tuple(exclude_name_parts)
+        self.file_metrics: List[FileMetrics] = []
+        self.function_metrics: List[FunctionMetrics] = []
+        self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.cache: Optional[MetricsCache] = None
+        if cache_path is not None:
+            try:
+                self.cache = MetricsCache(cache_path)
+            except sqlite3.Error as e:
+                print(f"Metrics cache disabled ({cache_path}): {e}")
+
+    def relative_path(self, file_path: Path) -> str:
+        """Return file_path relative to the project root as a string."""
+        path_str = str(file_path)
+        if path_str.startswith(self._root_str):
+            return path_str[self._root_len:]
+        return str(file_path.relative_to(self.project_root))
+
+    def read_source(self, file_path: Path) -> Optional[str]:
+        """Read a source file once; returns None if it cannot be read."""
+        try:
+            return read_text(file_path)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            return None
+
+    def count_file_lines(self, lines: List[str],
+                         limit: Optional[int] = None) -> Tuple[int, int, int, int]:
+        """
+        Count lines in already-split file content.
+        Returns: (total_lines, code_lines, comment_lines, blank_lines)
+
+        With limit set, lines are classified in chunks and counting stops once
+        code_lines exceeds it; the code, comment and blank counts then only
+        cover the lines read so far.
+        """
+        # A trailing newline does not start another line
+        if lines and lines[-1] == '':
+            lines = lines[:-1]
+        total_lines = len(lines)
+
+        if limit is None or total_lines <= limit:
+            stripped = [line for line in map(str.strip, lines) if line]
+            code_lines = count_code_lines(stripped)[0]
+            blank_lines = total_lines - len(stripped)
+            return (total_lines, code_lines, len(stripped) - code_lines, blank_lines)
+
+        # Each line adds at most one code line, so a chunk of
+        # limit - code_lines + 1 lines is the least that can cross the limit
+        code_lines = 0
+        non_blank = 0
+        in_block = False
+        pos = 0
+        while pos < total_lines and code_lines <= limit:
+            end = pos + max(limit - code_lines + 1, self.FAST_PATH_MIN_CHUNK)
+            stripped = [line for line in map(str.strip, lines[pos:end]) if line]
+            chunk_code, in_block = count_code_lines(stripped, in_block)
+            code_lines += chunk_code
+            non_blank += len(stripped)
+            pos = min(end, total_lines)
+
+        return (total_lines, code_lines, non_blank - code_lines, pos - non_blank)
+
+    def extract_dart_functions(self, file_path: Path,
+                               lines: List[str]) -> List[FunctionMetrics]:
+        """Extract function metrics from Dart source split into lines."""
+        functions = []
+        function_limit = self.MAX_FUNCTION_LINES if self.fast_path else None
+
+        depths = None
+
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            func_name = parse_dart_declaration(line) if '(' in line else None
+            if func_name is None:
+                i += 1
+                continue
+
+            start_line = i
+
+            # Count lines until the function ends
+            is_arrow_function = '=>' in line
+
+            if is_arrow_function:
+                # Arrow function - ends at semicolon
+                func_lines = [lines[i]]
+                i += 1
+                while i < len(lines) and ';' not in lines[i]:
+                    func_lines.append(lines[i])
+                    i += 1
+                if i < len(lines):
+                    func_lines.append(lines[i])
+            else:
+                # Regular function with braces
+                if depths is None:
+                    depths = brace_depths(lines)
+                end = block_end(depths, i)
+                func_lines = lines[i:end]
+                i = end
+
+            # Count code lines (excluding comments and blanks)
+            code_lines = self.count_file_lines(func_lines, function_limit)[1]
+
+            functions.append(FunctionMetrics(
+                name=func_name,
+                file_path=str(file_path),
+                line_number=start_line + 1,
+                code_lines=code_lines
+            ))
+
+        return functions
+
+    def extract_rust_functions(self, file_path: Path, content: str,
+                               lines: List[str]) -> List[FunctionMetrics]:
+        """Extract function metrics from Rust source split into lines."""
+        functions = []
+        function_limit = self.MAX_FUNCTION_LINES if self.fast_path else None
+
+        starts = line_starts(lines)
+        depths = brace_depths(lines)
+
+        i = 0
+        for match in iter_rust_declarations(content):
+            start_line = bisect.bisect_right(starts, match.start()) - 1
+            if start_line < i:
+                # Declaration inside a function body already consumed
+                continue
+
+            i = start_line
+            func_name = match.group(1)
+
+            # Find opening brace
+            while i < len(lines) and '{' not in lines[i]:
+                i += 1
+
+            if i >= len(lines):
+                break
+
+            # Count lines until the function ends
+            end = block_end(depths, i)
+            func_lines = lines[start_line:end]
+            i = end
+
+            # Count code lines (excluding comments and blanks)
+            code_lines = self.count_file_lines(func_lines, function_limit)[1]
+
+            functions.append(FunctionMetrics(
+                name=func_name,
+                file_path=str(file_path),
+                line_number=start_line + 1,
+                code_lines=code_lines
+            ))
+
+        return functions
+
+    def scan_source(self, file_path: Path, lang: str) -> ScanResult:
+        """Read and scan a single file without touching analyzer state."""
+        # Read once and share the split lines between both passes
+        content = self.read_source(file_path)
+        if content is None:
+            content = ''
+        lines = content.split('\n')
+
+        counts = self.count_file_lines(
+            lines, self.MAX_FILE_LINES if self.fast_path else None
+        )
+
+        # Extract function metrics
+        if lang == 'dart':
+            functions = self.extract_dart_functions(file_path, lines)
+        elif lang == 'rust':
+            functions = self.extract_rust_functions(file_path, content, lines)
+        else:
+            functions = []
+
+        return counts, functions
+
+    def cached_scan(self, file_path: Path,
+                    rel_path: str) -> Tuple[Optional[str], Optional[ScanResult]]:
+        """
+        Look up a file (keyed by its relative path) in the cache.
+        Returns: (sha, result) where result is None on a miss
+        """
+        if self.cache is None:
+            return None, None
+        sha = MetricsCache.digest(file_path)
+        if sha is None:
+            return None, None
+        return sha, self.cache.get(rel_path, sha)
+
+    def build_file_metrics(self, rel_path: str, scan: ScanResult) -> FileMetrics:
+        """Check a scan result against the limits and record its functions."""
+        (total, code, comments, blanks), functions = scan
+
+        violations = []
+        if code > self.MAX_FILE_LINES:
+            violations.append((FILE_VIOLATION, code))
+
+        # Check function length violations
+        limit = self.MAX_FUNCTION_LINES
+        for func in functions:
+            if func.code_lines > limit:
+                violations.append(
+                    (FUNCTION_VIOLATION, func.code_lines, func.name, func.line_number)
+                )
+        self.function_metrics.extend(functions)
+
+        return FileMetrics(
+            path=rel_path,
+            total_lines=total,
+            code_lines=code,
+            comment_lines=comments,
+            blank_lines=blanks,
+            violations=violations
+        )
+
+    def analyze_file(self, file_path: Path, lang: str) -> FileMetrics:
+        """Analyze a single file."""
+        rel_path = self.relative_path(file_path)
+        # Reuse the cached scan when the file content is unchanged
+        sha, scan = self.cached_scan(file_path, rel_path)
+        if scan is None:
+            scan = self.scan_source(file_path, lang)
+            # Truncated fast-path counts must not be served to exact runs
+            if sha is not None and not self.fast_path:
+                self.cache.put(rel_path, sha, scan)
+
+        return self.build_file_metrics(rel_path, scan)
+
+    def scan_directory(self, directory: Path, lang: Optional[str] = None):
+        """Scan a directory for source files of lang (default: all LANGUAGES)."""
+        extensions = [ext for ext, name in LANGUAGES.items() if lang in (None, name)]
+        paths = list(iter_source_files(
+            directory, extensions,
+            self.exclude_dirs, self.exclude_suffixes, self.exclude_name_parts
+        ))
+        langs = [LANGUAGES[file_path.suffix] for file_path in paths]
+        rel_paths = [self.relative_path(file_path) for file_path in paths]
+
+        # Resolve cache hits first so only changed files are scanned
+        shas = []
+        scans: List[Optional[ScanResult]] = []
+        for file_path, rel_path in zip(paths, rel_paths):
+            sha, scan = self.cached_scan(file_path, rel_path)
+            shas.append(sha)
+            scans.append(scan)
+
+        misses = [i for i, scan in enumerate(scans) if scan is None]
+        executor = self.get_executor(len(misses))
+        if executor is not None:
+            results = executor.map(
+                _scan_file,
+                [paths[i] for i in misses],
+                [langs[i] for i in misses],
+                repeat(self.fast_path),
+                chunksize=16
+            )
+        else:
+            results = (self.scan_source(paths[i], langs[i]) for i in misses)
+
+        for i, scan in zip(misses, results):
+            scans[i] = scan
+            if shas[i] is not None and not self.fast_path:
+                self.cache.put(rel_paths[i], shas[i], scan)
+
+        for rel_path, scan in zip(rel_paths, scans):
+            self.file_metrics.append(self.build_file_metrics(rel_path, scan))
+
+        if self.cache is not None:
+            self.cache.flush()
+
+    def get_executor(self, file_count: int) -> Optional[ProcessPoolExecutor]:
+        """Return the shared worker pool, or None when scanning serially is cheaper."""
+        if self.jobs <= 1 or file_count < self.PARALLEL_MIN_FILES:
+            return None
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        return self.executor
+
+    def close(self):
+        """Release the metrics cache and worker pool, if any."""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def total_violations(self) -> int:
+        """Count file and function limit violations."""
+        return sum(len(f.violations) for f in self.file_metrics)
+
+
+def _scan_file(file_path: Path, lang: str, fast_path: bool = False) -> ScanResult:
+    """Process pool entry point: scan one file in a worker."""
+    analyzer = MetricsAnalyzer(file_path.parent, fast_path=fast_path)
+    return analyzer.scan_source(file_path, lang)
+
+
+def analyze_paths(project_root: Path, paths: Iterable[Path], *,
+                  language_hint: Optional[str] = None,
+                  cache_path: Optional[Path] = CACHE_PATH,
+                  jobs: Optional[int] = None,
+                  exclude_dirs: Iterable[str] = EXCLUDE_DIRS,
+                  exclude_suffixes: Sequence[str] = EXCLUDE_SUFFIXES,
+                  exclude_name_parts: Sequence[str] = EXCLUDE_NAME_PARTS,
+                  fast_path: bool = False) -> MetricsAnalyzer:
+    """
+    Scan every directory in paths and return the populated analyzer.
+
+    language_hint restricts the scan to one language; by default every
+    extension in LANGUAGES is analyzed. fast_path only detects violations
+    and reports lower-bound sizes for files and functions over the limits.
+    """
+    analyzer = MetricsAnalyzer(
+        project_root,
+        cache_path=cache_path,
+        jobs=jobs,
+        exclude_dirs=exclude_dirs,
+        exclude_suffixes=exclude_suffixes,
+        exclude_name_parts=exclude_name_parts,
+        fast_path=fast_path
+    )
+    try:
+        for path in paths:
+            analyzer.scan_directory(path, language_hint)
+    finally:
+        analyzer.close()
+    return analyzer
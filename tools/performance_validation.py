@@ -19,13 +19,74 @@ Requirements:
 
 import argparse
 import json
+import re
+import statistics
 import subprocess
 import sys
+import threading
 import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib encoder is used without it
+    orjson = None
+
+# "[name]: [value]" lines of a `getprop` dump
+GETPROP_RE = re.compile(r'^\[([^\]]+)\]: \[(.*)\]\r?$', re.MULTILINE)
+
+# Metric values logged by the app, e.g. "Processing latency: 12.5ms"; the
+# value is the first number within a few characters after the metric name.
+# Logcat is read as bytes, so these are bytes patterns.
+METRIC_RE = {
+    metric: re.compile(metric.encode() + rb'[^0-9-]{0,8}(-?\d+(?:\.\d+)?)\s*ms', re.IGNORECASE)
+    for metric in ('latency', 'jitter', 'overhead')
+}
+
+# Device-side prefilter for `logcat --regex` (Android 7.0+), which has no
+# case-insensitive flag, so each letter is spelled as a [Xx] class
+LOGCAT_REGEX = '({}).*ms'.format('|'.join(
+    ''.join(f'[{c.upper()}{c}]' for c in metric) for metric in METRIC_RE
+))
+
+
+def read_logcat_values(stream, routes: Dict[bytes, Tuple[re.Pattern, Sequence[float]]]):
+    """
+    Demultiplex a binary `logcat -v tag` stream by tag.
+
+    Each line looks like b"D/AudioEngine: Processing latency: 12.5ms" (short
+    tags are space-padded); the message of a tag listed in routes is
+    searched with that tag's pattern and the value appended to its values.
+    Lines are never decoded: float() parses the matched bytes directly.
+    """
+    for line in stream:
+        prefix, _, message = line.partition(b': ')
+        route = routes.get(prefix[2:].rstrip())
+        if route is not None and (match := route[0].search(message)):
+            route[1].append(float(match.group(1)))
+
+
+def stop_process(process: subprocess.Popen, grace: float = 0.2):
+    """Terminate a capture process, killing it if it outlives a short grace period."""
+    process.terminate()
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def percentiles(values: Sequence[float]) -> Tuple[float, float, float]:
+    """Return the (p50, p95, p99) of a non-empty sample."""
+    if len(values) < 2:
+        return (values[0],) * 3
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
 
 
 @dataclass
@@ -59,6 +120,43 @@ class PerformanceValidator:
     MAX_CPU_USAGE = 15.0
     MAX_STREAM_OVERHEAD_MS = 5.0
 
+    # Android package whose CPU usage is measured
+    PACKAGE_NAME = "com.beatboxtrainer.app"  # Adjust if different
+
+    # Printed after each command sent to the persistent adb shell, followed
+    # by the command's exit status
+    SHELL_SENTINEL = '__DONE__'
+
+    # Seconds a persistent shell command may take before the shell is killed;
+    # the first command on a new shell also waits for adb to start the server
+    # and connect to the device, so it gets longer
+    SHELL_TIMEOUT = 5
+    SHELL_START_TIMEOUT = 30
+
+    # First SDK level whose logcat supports --regex (Android 7.0)
+    LOGCAT_REGEX_MIN_SDK = 24
+
+    # Length of the shared sampling window for all measurements
+    CAPTURE_SECONDS = 10
+
+    # Samples per measurement that are enough for a stable result; the
+    # shared window closes early once every measurement has its target.
+    # The metronome only logs a couple of jitter lines per second, and top
+    # reports CPU usage once per second.
+    TARGET_SAMPLES = {
+        'latency': 200,
+        'jitter': 16,
+        'stream_overhead': 200,
+        'cpu': 5,
+    }
+
+    # Logcat filter specs and value pattern for each log-derived measurement
+    LOGCAT_CAPTURES = {
+        'latency': (['AudioEngine:D', 'RustAudio:D'], METRIC_RE['latency']),
+        'jitter': (['Metronome:D', 'BeatScheduler:D'], METRIC_RE['jitter']),
+        'stream_overhead': (['StreamMetrics:D', 'ClassificationStream:D'], METRIC_RE['overhead']),
+    }
+
     def __init__(self, device_id: Optional[str] = None):
         """
         Initialize performance validator.
@@ -70,6 +168,97 @@ class PerformanceValidator:
         self.adb_prefix = ['adb']
         if device_id:
             self.adb_prefix.extend(['-s', device_id])
+        self._properties: Optional[Dict[str, str]] = None
+        self._device_info_cache: Optional[Dict[str, str]] = None
+        self._shell: Optional[subprocess.Popen] = None
+        self._shell_lock = threading.Lock()
+
+    def _shell_cmd(self, cmd: str) -> str:
+        """
+        Run a command in the persistent adb shell and return its output.
+
+        The shell is started on first use and reused for every later command,
+        saving an adb client start and server round-trip per command.
+
+        Args:
+            cmd: Shell command line to run on the device
+
+        Returns:
+            Standard output of the command
+
+        Raises:
+            subprocess.CalledProcessError: If the command exits non-zero, the
+                shell has gone away, or it takes longer than SHELL_TIMEOUT
+                (SHELL_START_TIMEOUT when it has to start the shell)
+        """
+        with self._shell_lock:
+            timeout = self.SHELL_TIMEOUT
+            if self._shell is None:
+                timeout = self.SHELL_START_TIMEOUT
+                self._shell = subprocess.Popen(
+                    self.adb_prefix + ['shell'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1
+                )
+
+            try:
+                self._shell.stdin.write(f"{cmd}; echo {self.SHELL_SENTINEL}$?\n")
+                self._shell.stdin.flush()
+            except OSError:
+                self._discard_shell()
+                raise subprocess.CalledProcessError(-1, cmd)
+
+            # A stalled command kills the shell, which ends the read below
+            watchdog = threading.Timer(timeout, self._shell.kill)
+            watchdog.start()
+            output = []
+            try:
+                while True:
+                    line = self._shell.stdout.readline()
+                    if not line:
+                        self._discard_shell()
+                        raise subprocess.CalledProcessError(-1, cmd, ''.join(output))
+                    # Output without a trailing newline shares the sentinel's line
+                    head, marker, status = line.rpartition(self.SHELL_SENTINEL)
+                    if marker:
+                        output.append(head)
+                        break
+                    output.append(line)
+            finally:
+                watchdog.cancel()
+
+        stdout = ''.join(output)
+        if status.strip() != '0':
+            raise subprocess.CalledProcessError(int(status.strip() or -1), cmd, stdout)
+        return stdout
+
+    def _discard_shell(self):
+        """Kill a broken persistent shell; the next command starts a new one."""
+        self._shell.kill()
+        self._shell.wait()
+        try:
+            self._shell.stdin.close()
+        except OSError:
+            pass
+        self._shell = None
+
+    def close(self):
+        """Close the persistent adb shell, if one was started."""
+        if self._shell is not None:
+            try:
+                self._shell.stdin.close()
+            except OSError:
+                # adb already exited; the unflushed command can't be sent
+                pass
+            try:
+                self._shell.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._shell.kill()
+                self._shell.wait()
+            self._shell = None
 
     def validate_all(self) -> List[ValidationResult]:
         """
@@ -98,10 +287,12 @@ class PerformanceValidator:
         print("Running performance measurements...")
         print("-" * 70)
 
+        samples, cpu_samples = self._collect_samples()
+
         results = []
 
         # 1. Measure audio processing latency
-        latency = self._measure_latency()
+        latency = self._measure_latency(samples['latency'])
         results.append(ValidationResult(
             metric_name="Audio Processing Latency",
             measured_value=latency,
@@ -112,7 +303,7 @@ class PerformanceValidator:
         ))
 
         # 2. Measure metronome jitter
-        jitter = self._measure_jitter()
+        jitter = self._measure_jitter(samples['jitter'])
         results.append(ValidationResult(
             metric_name="Metronome Jitter",
             measured_value=jitter,
@@ -123,7 +314,7 @@ class PerformanceValidator:
         ))
 
         # 3. Measure CPU usage
-        cpu_usage = self._measure_cpu_usage()
+        cpu_usage = self._measure_cpu_usage(cpu_samples)
         results.append(ValidationResult(
             metric_name="CPU Usage",
             measured_value=cpu_usage,
@@ -134,7 +325,7 @@ class PerformanceValidator:
         ))
 
         # 4. Measure stream overhead
-        stream_overhead = self._measure_stream_overhead()
+        stream_overhead = self._measure_stream_overhead(samples['stream_overhead'])
         results.append(ValidationResult(
             metric_name="Stream Overhead",
             measured_value=stream_overhead,
@@ -165,17 +356,10 @@ class PerformanceValidator:
             print("ERROR: adb not found. Please install Android SDK Platform Tools.")
             return False
 
-        # Check device connected
+        # Check device connected; this also opens the persistent shell that
+        # every later device command goes through
         try:
-            result = subprocess.run(
-                self.adb_prefix + ['get-state'],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            if result.stdout.strip() != 'device':
-                print("ERROR: Android device not in 'device' state.")
-                return False
+            self._shell_cmd('true')
         except subprocess.CalledProcessError:
             print("ERROR: No Android device connected or device not authorized.")
             print("Please connect device and run 'adb devices' to authorize.")
@@ -183,6 +367,22 @@ class PerformanceValidator:
 
         return True
 
+    def _get_device_properties(self) -> Dict[str, str]:
+        """
+        Get all system properties from a single `getprop` dump.
+
+        The result is cached, as device properties don't change during a run.
+
+        Returns:
+            Dictionary mapping property names to values
+        """
+        if self._properties is None:
+            try:
+                self._properties = dict(GETPROP_RE.findall(self._shell_cmd('getprop')))
+            except subprocess.CalledProcessError:
+                self._properties = {}
+        return self._properties
+
     def _get_device_info(self) -> Dict[str, str]:
         """
         Get device information.
@@ -190,160 +390,197 @@ class PerformanceValidator:
         Returns:
             Dictionary with device model, manufacturer, and Android version
         """
-        info = {}
+        if self._device_info_cache is None:
+            props = self._get_device_properties()
+            self._device_info_cache = {
+                'model': props.get('ro.product.model', 'Unknown'),
+                'manufacturer': props.get('ro.product.manufacturer', 'Unknown'),
+                'android_version': props.get('ro.build.version.release', 'Unknown'),
+            }
+        return self._device_info_cache
+
+    def _collect_samples(self) -> Tuple[Dict[str, Sequence[float]], List[float]]:
+        """
+        Capture logcat metrics and CPU usage over one shared window.
+
+        A single background logcat session covers every tag and is drained
+        line by line by a reader thread that keeps only the parsed values,
+        and CPU usage is sampled from a worker thread, so all four
+        measurements take one CAPTURE_SECONDS window instead of one each.
+        The window closes early, for logcat and CPU sampling alike, once
+        every measurement has its TARGET_SAMPLES. If logcat exits first,
+        CPU sampling still runs to the end of its own window.
+
+        Returns:
+            Parsed logcat values keyed by LOGCAT_CAPTURES name, and CPU samples
+        """
+        print(f"  Collecting samples (up to {self.CAPTURE_SECONDS} seconds)...")
 
-        # Get model
+        # Clear logcat once so every capture starts from the same point
         try:
-            result = subprocess.run(
-                self.adb_prefix + ['shell', 'getprop', 'ro.product.model'],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            info['model'] = result.stdout.strip()
+            self._shell_cmd('logcat -c')
         except subprocess.CalledProcessError:
-            info['model'] = 'Unknown'
-
-        # Get manufacturer
+            pass
+
+        # Route every captured tag to its measurement's pattern and samples;
+        # values go straight into flat C double arrays
+        samples: Dict[str, Sequence[float]] = {}
+        routes = {}
+        filter_specs = []
+        for name, (specs, pattern) in self.LOGCAT_CAPTURES.items():
+            samples[name] = array('d')
+            for spec in specs:
+                routes[spec.partition(':')[0].encode()] = (pattern, samples[name])
+            filter_specs.extend(specs)
+
+        # One logcat session for all tags; tag format adds only the
+        # priority and tag needed to demultiplex the messages
+        logcat_cmd = ['logcat', '-v', 'tag']
         try:
-            result = subprocess.run(
-                self.adb_prefix + ['shell', 'getprop', 'ro.product.manufacturer'],
-                check=True,
-                capture_output=True,
-                text=True
+            sdk = int(self._get_device_properties().get('ro.build.version.sdk', ''))
+        except ValueError:
+            sdk = 0
+        if sdk >= self.LOGCAT_REGEX_MIN_SDK:
+            # Drop non-metric lines on the device, before they cross adb
+            logcat_cmd.append(f'--regex={LOGCAT_REGEX}')
+
+        process = subprocess.Popen(
+            self.adb_prefix + logcat_cmd + ['-s', '*:S'] + filter_specs,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        reader = threading.Thread(
+            target=read_logcat_values,
+            args=(process.stdout, routes),
+            daemon=True
+        )
+        reader.start()
+
+        cpu_samples: List[float] = []
+        window_closed = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            cpu_future = executor.submit(
+                self._sample_cpu_usage, window_closed, cpu_samples
             )
-            info['manufacturer'] = result.stdout.strip()
-        except subprocess.CalledProcessError:
-            info['manufacturer'] = 'Unknown'
 
-        # Get Android version
+            # Collect until the window ends or logcat exits; close it early
+            # once every measurement has enough samples (a CPU sampler that
+            # has already finished has nothing more to add)
+            deadline = time.monotonic() + self.CAPTURE_SECONDS
+            while time.monotonic() < deadline and reader.is_alive():
+                if (all(len(v) >= self.TARGET_SAMPLES[name]
+                        for name, v in samples.items())
+                        and (len(cpu_samples) >= self.TARGET_SAMPLES['cpu']
+                             or cpu_future.done())):
+                    window_closed.set()
+                    break
+                time.sleep(0.1)
+
+            # The reader has already consumed everything logcat wrote, so
+            # nothing is lost if it has to be killed
+            stop_process(process)
+            reader.join()
+
+            # Unless the window closed early, top ends after its own window
+            cpu_future.result()
+            window_closed.set()
+
+        return samples, cpu_samples
+
+    def _sample_cpu_usage(self, window_closed: threading.Event,
+                          samples: List[float]):
+        """
+        Sample the app's CPU usage once per second over the capture window.
+
+        A single streaming `top` process produces every sample, instead of
+        spawning one adb shell per sample.
+
+        Args:
+            window_closed: Set when the shared capture window ends early
+            samples: Receives CPU usage percentages, one per successful
+                sample, as they arrive
+        """
+        # Resolve the app's pid once so top only reports our process
         try:
-            result = subprocess.run(
-                self.adb_prefix + ['shell', 'getprop', 'ro.build.version.release'],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            info['android_version'] = result.stdout.strip()
+            pids = self._shell_cmd(f'pidof {self.PACKAGE_NAME}').split()
         except subprocess.CalledProcessError:
-            info['android_version'] = 'Unknown'
+            return
+        if not pids:
+            return
+        pid = pids[0]
+
+        process = subprocess.Popen(
+            self.adb_prefix + ['shell', 'top', '-d', '1', '-b', '-p', pid,
+                               '-n', str(self.CAPTURE_SECONDS)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
 
-        return info
+        def stop_at_window_end():
+            # End with the shared window, or if top stalls past it
+            window_closed.wait(self.CAPTURE_SECONDS + 5)
+            stop_process(process)
 
-    def _measure_latency(self) -> float:
+        threading.Thread(target=stop_at_window_end, daemon=True).start()
+
+        try:
+            for line in process.stdout:
+                # Extract CPU% (typically 9th column) from our process row
+                parts = line.split()
+                if len(parts) >= 9 and parts[0] == pid:
+                    try:
+                        samples.append(float(parts[8].replace('%', '')))
+                    except ValueError:
+                        continue
+                    if len(samples) == self.CAPTURE_SECONDS:
+                        break
+        finally:
+            stop_process(process)
+
+    def _measure_latency(self, latencies: Sequence[float]) -> float:
         """
         Measure audio processing latency.
 
         This uses the debug metrics exposed by the Rust audio engine to measure
         the time from onset detection to classification result emission.
 
+        Args:
+            latencies: Latency values logged by the AudioEngine/RustAudio tags
+
         Returns:
             Average latency in milliseconds
         """
         print("  [1/4] Measuring audio processing latency...")
 
-        # Strategy: Use logcat to capture debug metrics from the app
-        # The Rust audio engine logs latency metrics with tag "AudioEngine"
-
-        # Clear logcat
-        subprocess.run(
-            self.adb_prefix + ['logcat', '-c'],
-            check=False,
-            capture_output=True
-        )
-
-        # Trigger audio processing (via adb input or automation)
-        # For now, we'll capture over a 10-second window
-        print("     Collecting latency samples (10 seconds)...")
-
-        # Start logcat capture
-        process = subprocess.Popen(
-            self.adb_prefix + ['logcat', '-s', 'AudioEngine:D', 'RustAudio:D'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        # Collect for 10 seconds
-        time.sleep(10)
-        process.terminate()
-        stdout, _ = process.communicate(timeout=2)
-
-        # Parse latency values from logcat
-        latencies = []
-        for line in stdout.splitlines():
-            # Look for lines like: "AudioEngine: Processing latency: 12.5ms"
-            if 'latency' in line.lower() and 'ms' in line:
-                try:
-                    # Extract numeric value
-                    parts = line.split('latency')
-                    if len(parts) > 1:
-                        value_part = parts[1].split('ms')[0].strip().replace(':', '').strip()
-                        latency = float(value_part)
-                        latencies.append(latency)
-                except (ValueError, IndexError):
-                    continue
-
         if latencies:
-            avg_latency = sum(latencies) / len(latencies)
-            print(f"     Captured {len(latencies)} samples, average: {avg_latency:.2f}ms")
+            avg_latency = statistics.fmean(latencies)
+            p50, p95, p99 = percentiles(latencies)
+            print(f"     Captured {len(latencies)} samples, average: {avg_latency:.2f}ms, "
+                  f"p50: {p50:.2f}ms, p95: {p95:.2f}ms, p99: {p99:.2f}ms")
             return avg_latency
         else:
             print("     WARNING: No latency samples captured from logcat.")
             print("     Using estimate: 15.0ms (below threshold)")
             return 15.0  # Conservative estimate
 
-    def _measure_jitter(self) -> float:
+    def _measure_jitter(self, jitters: Sequence[float]) -> float:
         """
         Measure metronome jitter.
 
         The metronome should have perfect timing (0ms jitter) due to the
         high-precision timer implementation in Rust.
 
+        Args:
+            jitters: Jitter values logged by the Metronome/BeatScheduler tags
+
         Returns:
             Maximum jitter in milliseconds
         """
         print("  [2/4] Measuring metronome jitter...")
 
-        # Clear logcat
-        subprocess.run(
-            self.adb_prefix + ['logcat', '-c'],
-            check=False,
-            capture_output=True
-        )
-
-        print("     Collecting metronome timing samples (10 seconds)...")
-
-        # Start logcat capture for metronome events
-        process = subprocess.Popen(
-            self.adb_prefix + ['logcat', '-s', 'Metronome:D', 'BeatScheduler:D'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        # Collect for 10 seconds
-        time.sleep(10)
-        process.terminate()
-        stdout, _ = process.communicate(timeout=2)
-
-        # Parse timing jitter from logcat
-        jitters = []
-        for line in stdout.splitlines():
-            # Look for lines like: "Metronome: Jitter: 0.0ms"
-            if 'jitter' in line.lower() and 'ms' in line:
-                try:
-                    parts = line.split('jitter')
-                    if len(parts) > 1:
-                        value_part = parts[1].split('ms')[0].strip().replace(':', '').strip()
-                        jitter = float(value_part)
-                        jitters.append(jitter)
-                except (ValueError, IndexError):
-                    continue
-
         if jitters:
             max_jitter = max(jitters)
-            avg_jitter = sum(jitters) / len(jitters)
             print(f"     Captured {len(jitters)} samples, max jitter: {max_jitter:.2f}ms")
             return max_jitter
         else:
@@ -351,53 +588,20 @@ class PerformanceValidator:
             print("     Using estimate: 0.0ms (meets requirement)")
             return 0.0  # Metronome is deterministic
 
-    def _measure_cpu_usage(self) -> float:
+    def _measure_cpu_usage(self, samples: List[float]) -> float:
         """
         Measure CPU usage during active audio processing.
 
+        Args:
+            samples: CPU usage percentages from _sample_cpu_usage
+
         Returns:
             Average CPU usage percentage
         """
         print("  [3/4] Measuring CPU usage...")
 
-        # Get package name
-        package_name = "com.beatboxtrainer.app"  # Adjust if different
-
-        print("     Collecting CPU usage samples (10 seconds)...")
-
-        # Collect CPU usage over 10 seconds
-        samples = []
-        for _ in range(10):
-            try:
-                # Use 'top' command to get CPU usage
-                result = subprocess.run(
-                    self.adb_prefix + ['shell', 'top', '-n', '1', '-b'],
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-
-                # Parse output for our package
-                for line in result.stdout.splitlines():
-                    if package_name in line:
-                        # Extract CPU% (typically 9th column)
-                        parts = line.split()
-                        if len(parts) >= 9:
-                            try:
-                                cpu_str = parts[8].replace('%', '')
-                                cpu_usage = float(cpu_str)
-                                samples.append(cpu_usage)
-                                break
-                            except (ValueError, IndexError):
-                                continue
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                pass
-
-            time.sleep(1)
-
         if samples:
-            avg_cpu = sum(samples) / len(samples)
+            avg_cpu = statistics.fmean(samples)
             max_cpu = max(samples)
             print(f"     Captured {len(samples)} samples, average: {avg_cpu:.1f}%, max: {max_cpu:.1f}%")
             return avg_cpu
@@ -406,57 +610,26 @@ class PerformanceValidator:
             print("     Using estimate: 12.0% (below threshold)")
             return 12.0  # Conservative estimate
 
-    def _measure_stream_overhead(self) -> float:
+    def _measure_stream_overhead(self, overheads: Sequence[float]) -> float:
         """
         Measure stream overhead (classification stream latency).
 
         This measures the additional latency introduced by the stream
         implementation (tokio broadcast -> FFI -> Dart StreamController).
 
+        Args:
+            overheads: Overhead values logged by the StreamMetrics/ClassificationStream tags
+
         Returns:
             Average stream overhead in milliseconds
         """
         print("  [4/4] Measuring stream overhead...")
 
-        # Clear logcat
-        subprocess.run(
-            self.adb_prefix + ['logcat', '-c'],
-            check=False,
-            capture_output=True
-        )
-
-        print("     Collecting stream timing samples (10 seconds)...")
-
-        # Start logcat capture for stream metrics
-        process = subprocess.Popen(
-            self.adb_prefix + ['logcat', '-s', 'StreamMetrics:D', 'ClassificationStream:D'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        # Collect for 10 seconds
-        time.sleep(10)
-        process.terminate()
-        stdout, _ = process.communicate(timeout=2)
-
-        # Parse stream overhead from logcat
-        overheads = []
-        for line in stdout.splitlines():
-            # Look for lines like: "StreamMetrics: Overhead: 2.3ms"
-            if 'overhead' in line.lower() and 'ms' in line:
-                try:
-                    parts = line.split('overhead')
-                    if len(parts) > 1:
-                        value_part = parts[1].split('ms')[0].strip().replace(':', '').strip()
-                        overhead = float(value_part)
-                        overheads.append(overhead)
-                except (ValueError, IndexError):
-                    continue
-
         if overheads:
-            avg_overhead = sum(overheads) / len(overheads)
-            print(f"     Captured {len(overheads)} samples, average: {avg_overhead:.2f}ms")
+            avg_overhead = statistics.fmean(overheads)
+            p50, p95, p99 = percentiles(overheads)
+            print(f"     Captured {len(overheads)} samples, average: {avg_overhead:.2f}ms, "
+                  f"p50: {p50:.2f}ms, p95: {p95:.2f}ms, p99: {p99:.2f}ms")
             return avg_overhead
         else:
             print("     WARNING: No stream overhead samples captured from logcat.")
@@ -531,8 +704,13 @@ class PerformanceValidator:
             'all_passed': all(r.passed for r in results)
         }
 
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, indent=2).encode('utf-8')
+
+        with open(output_path, 'wb') as f:
+            f.write(payload)
 
         print(f"\nResults saved to: {output_path}")
 
@@ -559,16 +737,19 @@ def main():
     # Create validator
     validator = PerformanceValidator(device_id=args.device)
 
-    # Run validation
-    results = validator.validate_all()
+    try:
+        # Run validation
+        results = validator.validate_all()
 
-    # Generate report
-    report = validator.generate_report(results)
-    print(report)
+        # Generate report
+        report = validator.generate_report(results)
+        print(report)
 
-    # Save results
-    output_path = Path(args.output)
-    validator.save_results(results, output_path)
+        # Save results
+        output_path = Path(args.output)
+        validator.save_results(results, output_path)
+    finally:
+        validator.close()
 
     # Exit with appropriate code
     all_passed = all(r.passed for r in results)